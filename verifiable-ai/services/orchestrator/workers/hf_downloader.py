@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
+import importlib.util
 import json, sys, time, os
+
+# Opt in to the Rust hf_transfer client (multi-connection range requests)
+# before huggingface_hub is imported; it reads the env var at import time.
+# Only when the package is actually installed - with the flag set but the
+# package absent, huggingface_hub refuses to download at all.
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from huggingface_hub import snapshot_download
 
-def emit(obj):
-    sys.stdout.write(json.dumps(obj) + "\n")
-    sys.stdout.flush()
+from jsonio import emit
 
-def main():
+def main(argv=None):
     # args: repo_id, revision(optional), allow_patterns(optional)
-    if len(sys.argv) < 2:
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) < 1:
         emit({"type":"error","message":"usage: hf_downloader.py <repo_id> [revision]"})
         return 2
 
-    repo_id = sys.argv[1]
-    revision = sys.argv[2] if len(sys.argv) >= 3 else None
+    repo_id = argv[0]
+    revision = argv[1] if len(argv) >= 2 else None
 
     out_dir = os.environ.get("HF_OUT_DIR", "/app/artifacts/hf")
     os.makedirs(out_dir, exist_ok=True)
@@ -27,6 +36,7 @@ def main():
             revision=revision,
             local_dir=os.path.join(out_dir, repo_id.replace("/", "__")),
             local_dir_use_symlinks=False,
+            max_workers=int(os.environ.get("HF_MAX_WORKERS", 8)),
             # progress is internal; we’ll emit coarse progress around phases
         )
         dt = round(time.time() - t0, 3)
@@ -0,0 +1,31 @@
+"""Shared NDJSON stdout helper for the workers.
+
+Serializes with orjson when it is installed (C JSON, bytes out) and falls
+back to the stdlib. Each event is written and flushed as one line, so call
+sites don't need their own json.dumps + flush() pair.
+"""
+import contextvars
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Set by worker_pool around each job so events emitted while a pooled job
+# runs carry that job's id - concurrent jobs share one stdout there, unlike
+# subprocess mode where each job owns its pipe. Unset (the default) leaves
+# emit output unchanged.
+job_id = contextvars.ContextVar("job_id", default=None)
+
+def emit(obj):
+    jid = job_id.get()
+    if jid is not None and "id" not in obj:
+        obj = {"id": jid, **obj}
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(obj) + "\n")
+        sys.stdout.flush()
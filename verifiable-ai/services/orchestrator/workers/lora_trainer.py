@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
 import json, sys, time
 
-def emit(obj):
-    sys.stdout.write(json.dumps(obj) + "\n")
-    sys.stdout.flush()
+from jsonio import emit
 
-def main():
+def main(argv=None):
     # args: job_id
-    job_id = sys.argv[1] if len(sys.argv) >= 2 else "unknown"
+    if argv is None:
+        argv = sys.argv[1:]
+    job_id = argv[0] if argv else "unknown"
     emit({"type":"start","worker":"lora_trainer","job_id":job_id})
 
     # Simulated training progress (longer duration for crash testing)
@@ -2,23 +2,35 @@ import argparse
 import os
 import sys
 import json
-import requests
+import httpx
+from jsonio import emit
 
-def main():
+def _make_client():
+    # Module-level client so repeated calls reuse the keep-alive pool;
+    # HTTP/2 needs the optional h2 package, fall back to HTTP/1.1 without it.
+    limits = httpx.Limits(max_keepalive_connections=16)
+    try:
+        return httpx.Client(http2=True, timeout=300, limits=limits)
+    except ImportError:
+        return httpx.Client(timeout=300, limits=limits)
+
+_client = _make_client()
+
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--api-url", required=True, help="LLM API Endpoint")
     parser.add_argument("--model", default="local", help="Model name")
     parser.add_argument("--prompt", required=True, help="User prompt")
     parser.add_argument("--system", default="You are a helpful assistant.", help="System prompt")
     parser.add_argument("--temperature", type=float, default=0.7)
-    args = parser.parse_args()
+    parser.add_argument("--stream", action="store_true", help="Stream partial tokens as delta events")
+    args = parser.parse_args(argv)
 
     # Log start
-    print(json.dumps({
+    emit({
         "type": "progress",
         "message": f"Generating text with model {args.model} at {args.api_url}..."
-    }))
-    sys.stdout.flush()
+    })
 
     try:
         payload = {
@@ -28,25 +40,46 @@ def main():
                 {"role": "user", "content": args.prompt}
             ],
             "temperature": args.temperature,
-            "stream": False
+            "stream": args.stream
         }
 
-        resp = requests.post(args.api_url, json=payload, timeout=300)
-        resp.raise_for_status()
-        
-        data = resp.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if args.stream:
+            # Forward partial tokens as they arrive so downstream can render
+            # before the full completion is done
+            parts = []
+            with _client.stream("POST", args.api_url, json=payload) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data).get("choices", [{}])[0].get("delta", {}).get("content", "")
+                    except ValueError:
+                        continue
+                    if delta:
+                        parts.append(delta)
+                        emit({"type": "delta", "text": delta})
+            content = "".join(parts)
+        else:
+            resp = _client.post(args.api_url, json=payload)
+            resp.raise_for_status()
+
+            data = resp.json()
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
         # Output final result
-        print(json.dumps({
+        emit({
             "type": "result",
             "result": content
-        }))
+        })
     except Exception as e:
-        print(json.dumps({
+        emit({
             "type": "error",
             "message": str(e)
-        }))
+        })
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Long-lived worker pool hosting the Python workers in one process.
+
+The orchestrator normally runs `python <worker>.py ...` per job, which pays
+interpreter startup plus heavy imports (torch/sentence-transformers,
+huggingface_hub, psycopg2) on every spawn. Spawning this pool once keeps
+those modules - and the kb_worker embedding model - warm across jobs.
+
+Jobs arrive as NDJSON lines on stdin:
+
+    {"id": "job-1", "worker": "kb_worker", "argv": ["--source-type", "files", ...]}
+
+Worker events go to stdout as in subprocess mode, except each line gains the
+job's "id" so concurrent jobs can be demuxed; the pool appends a
+{"type": "job_done", "id": ..., "exit_code": ...} line when a job finishes.
+Untrusted or crash-prone jobs can still be spawned as plain subprocesses by
+the orchestrator; this pool is an opt-in fast path.
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import jsonio
+
+# Worker name -> module in this directory. Imported lazily on first use so
+# the pool starts fast and only pays for what it actually runs.
+WORKERS = {
+    "hf_downloader": "hf_downloader",
+    "kb_worker": "kb_worker",
+    "lora_trainer": "lora_trainer",
+    "pack_build": "pack_build",
+    "text_generator": "text_generator",
+}
+
+def _run_worker(name, job_id, argv):
+    # Tag everything this job emits with its id: concurrent jobs interleave
+    # on the pool's shared stdout, and without the tag their progress lines
+    # can't be attributed (subprocess mode gives each job its own pipe).
+    # ContextVar state is per thread, so concurrent jobs don't clobber it.
+    token = jsonio.job_id.set(job_id)
+    try:
+        module = importlib.import_module(WORKERS[name])
+        return module.main(argv) or 0
+    finally:
+        jsonio.job_id.reset(token)
+
+def _emit(obj):
+    print(json.dumps(obj), flush=True)
+
+async def main():
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=int(os.environ.get("WORKER_POOL_SIZE", "4")))
+    inflight = set()
+
+    def on_done(job_id, fut):
+        inflight.discard(fut)
+        try:
+            code = fut.result()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            _emit({"type": "error", "id": job_id, "message": str(e)})
+            code = 1
+        _emit({"type": "job_done", "id": job_id, "exit_code": code})
+
+    _emit({"type": "ready", "workers": sorted(WORKERS)})
+
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            _emit({"type": "error", "message": f"Bad job line: {e}"})
+            continue
+
+        name = job.get("worker")
+        if name not in WORKERS:
+            _emit({"type": "error", "id": job.get("id"), "message": f"Unknown worker: {name}"})
+            continue
+
+        fut = loop.run_in_executor(pool, _run_worker, name, job.get("id"), job.get("argv", []))
+        inflight.add(fut)
+        fut.add_done_callback(partial(on_done, job.get("id")))
+
+    # stdin closed: let running jobs finish before exiting
+    if inflight:
+        await asyncio.gather(*inflight, return_exceptions=True)
+    pool.shutdown(wait=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())
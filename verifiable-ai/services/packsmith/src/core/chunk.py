@@ -1,3 +1,4 @@
+import itertools
 import blake3
 
 def deterministic_chunk(text: str, source_id: str, max_size: int = 1000) -> list:
@@ -5,43 +6,43 @@ def deterministic_chunk(text: str, source_id: str, max_size: int = 1000) -> list
     Chunks text deterministically.
     Returns list of dicts: {'id': ..., 'text': ..., 'offset': ...}
     """
-    chunks = []
-    current_offset = 0
-    
     # Very simple chunking for MVP: split by double newline or fixed size
     # A real implementation would use a better strategy (e.g. semantic or sentence based)
-    
+
     paragraphs = text.split("\n\n")
-    current_chunk = ""
-    chunk_start_offset = 0
-    
-    for para in paragraphs:
-        if len(current_chunk) + len(para) < max_size:
-            if current_chunk:
-                current_chunk += "\n\n"
-            current_chunk += para
-        else:
-            if current_chunk:
-                chunk_id = blake3.blake3(f"{source_id}:{chunk_start_offset}".encode()).hexdigest()
-                chunks.append({
-                    "id": chunk_id,
-                    "text": current_chunk,
-                    "offset": chunk_start_offset
-                })
-            
-            chunk_start_offset = current_offset + len(current_chunk) # Approx, needs careful handling for exact byte offsets if critical
-            # Reset
-            current_chunk = para
-            
-        current_offset += len(para) + 2 # +2 for \n\n
 
-    # Last chunk
-    if current_chunk:
+    # Exact start offset of every paragraph in the original text, so chunk
+    # offsets are no longer approximate.
+    offsets = list(itertools.accumulate((len(p) + 2 for p in paragraphs), initial=0))
+
+    chunks = []
+
+    def flush(start_idx, end_idx):
+        # Materialize the chunk text once via join instead of building it up
+        # with repeated string concatenation (which is quadratic).
+        chunk_text = "\n\n".join(paragraphs[start_idx:end_idx])
+        if not chunk_text:
+            return
+        chunk_start_offset = offsets[start_idx]
         chunk_id = blake3.blake3(f"{source_id}:{chunk_start_offset}".encode()).hexdigest()
         chunks.append({
             "id": chunk_id,
-            "text": current_chunk,
+            "text": chunk_text,
             "offset": chunk_start_offset
         })
-        
+
+    start = 0     # index of the first paragraph in the current chunk
+    buf_len = 0   # length the current chunk would have when joined
+
+    for i, para in enumerate(paragraphs):
+        if buf_len and buf_len + len(para) >= max_size:
+            flush(start, i)
+            start = i
+            buf_len = len(para)
+        else:
+            buf_len += len(para) + (2 if i > start else 0)
+
+    # Last chunk
+    flush(start, len(paragraphs))
+
     return chunks
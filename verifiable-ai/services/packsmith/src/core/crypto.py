@@ -1,4 +1,5 @@
 import blake3
+import functools
 import os
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
@@ -8,38 +9,72 @@ def hash_content(data: bytes) -> str:
     """Returns the Blake3 hash of the data."""
     return blake3.blake3(data).hexdigest()
 
+def hash_file(path: str) -> str:
+    """Returns the Blake3 hash of a file on disk.
+
+    Memory-maps the file and lets blake3 spread the work across cores,
+    which avoids reading the whole file into Python first.
+    """
+    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if hasattr(hasher, "update_mmap"):
+        hasher.update_mmap(path)
+    else:
+        # Older blake3 builds without mmap support: stream in 1 MiB blocks
+        with open(path, 'rb') as f:
+            while block := f.read(1 << 20):
+                hasher.update(block)
+    return hasher.hexdigest()
+
+def _parse_key(private_key_hex: str) -> ed25519.Ed25519PrivateKey:
+    try:
+        # Try loading as hex
+        private_bytes = bytes.fromhex(private_key_hex)
+        return ed25519.Ed25519PrivateKey.from_private_bytes(private_bytes)
+    except ValueError:
+        # If exact 32 bytes provided directly (unlikely in env var but possible)
+        return ed25519.Ed25519PrivateKey.from_private_bytes(private_key_hex.encode()[:32])
+
+@functools.lru_cache(maxsize=1)
+def _get_signer() -> ed25519.Ed25519PrivateKey:
+    """Default signer, loaded once per process.
+
+    Reads PACK_SIGNING_KEY from the env; if that is missing, generates a
+    new ephemeral key (WARN: for testing only).
+    """
+    private_key_hex = os.getenv("PACK_SIGNING_KEY")
+    if private_key_hex:
+        return _parse_key(private_key_hex)
+    # Fallback for testing/dev if no key provided
+    print("WARNING: No PACK_SIGNING_KEY found. Generating ephemeral key.")
+    return ed25519.Ed25519PrivateKey.generate()
+
+def _public_hex(private_key: ed25519.Ed25519PrivateKey) -> str:
+    """Raw public key bytes as hex for a private key."""
+    return private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    ).hex()
+
+@functools.lru_cache(maxsize=1)
+def _get_signer_public_hex() -> str:
+    """Public key hex of the default signer, derived once per process."""
+    return _public_hex(_get_signer())
+
 def sign_data(data: bytes, private_key_hex: str = None) -> Tuple[str, str]:
     """
     Signs data using Ed25519.
     Returns (signature_hex, public_key_hex).
-    
-    If private_key_hex is None, it tries to load from env PACK_SIGNING_KEY.
-    If that is missing, it generates a new ephemeral key (WARN: for testing only).
+
+    If private_key_hex is None, the cached default signer and its cached
+    public key are used, so neither is rederived on repeated calls.
     """
-    if private_key_hex is None:
-        private_key_hex = os.getenv("PACK_SIGNING_KEY")
-    
     if private_key_hex:
-        try:
-            # Try loading as hex
-            private_bytes = bytes.fromhex(private_key_hex)
-            private_key = ed25519.Ed25519PrivateKey.from_private_bytes(private_bytes)
-        except:
-             # If exact 32 bytes provided directly (unlikely in env var but possible)
-             private_key = ed25519.Ed25519PrivateKey.from_private_bytes(private_key_hex.encode()[:32])
+        private_key = _parse_key(private_key_hex)
+        public_key_hex = _public_hex(private_key)
     else:
-        # Fallback for testing/dev if no key provided
-        print("WARNING: No PACK_SIGNING_KEY found. Generating ephemeral key.")
-        private_key = ed25519.Ed25519PrivateKey.generate()
+        private_key = _get_signer()
+        public_key_hex = _get_signer_public_hex()
 
-    public_key = private_key.public_key()
-    
     signature = private_key.sign(data)
-    
-    # Export public key to raw bytes -> hex
-    public_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.Raw,
-        format=serialization.PublicFormat.Raw
-    )
-    
-    return signature.hex(), public_bytes.hex()
+
+    return signature.hex(), public_key_hex
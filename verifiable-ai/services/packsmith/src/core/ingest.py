@@ -5,14 +5,16 @@ import httpx
 # import git # Requires gitpython or subprocess
 import subprocess
 from typing import Optional
-from fastapi import UploadFile
 
 WORK_ROOT = "/tmp/ingest"
 
-async def ingest_source(job_id: str, source_type: str, source_value: Optional[str] = None, file: Optional[UploadFile] = None) -> str:
+async def ingest_source(job_id: str, source_type: str, source_value: Optional[str] = None, upload_path: Optional[str] = None) -> str:
     """
     Ingests source into a standardized directory structure.
     Returns path to ingested content.
+
+    For uploads the request handler has already streamed the body to
+    upload_path; this just extracts it.
     """
     dest_dir = os.path.join(WORK_ROOT, job_id)
     if os.path.exists(dest_dir):
@@ -20,19 +22,14 @@ async def ingest_source(job_id: str, source_type: str, source_value: Optional[st
     os.makedirs(dest_dir, exist_ok=True)
 
     if source_type == "upload":
-        if not file:
-            raise ValueError("File required for upload source")
-        
-        # Save temp file
-        temp_zip = os.path.join(dest_dir, "input.zip")
-        with open(temp_zip, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
+        if not upload_path:
+            raise ValueError("Uploaded file required for upload source")
+
         # Extract
-        with zipfile.ZipFile(temp_zip, 'r') as zip_ref:
+        with zipfile.ZipFile(upload_path, 'r') as zip_ref:
             zip_ref.extractall(dest_dir)
-            
-        os.remove(temp_zip)
+
+        os.remove(upload_path)
         return dest_dir
 
     elif source_type == "website":
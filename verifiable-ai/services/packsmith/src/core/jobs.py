@@ -1,7 +1,12 @@
+import atexit
 import json
+import threading
+import orjson
 import os
 import glob
-from typing import List, Optional
+import weakref
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional, Tuple
 from datetime import datetime
 from ..models import JobState
 
@@ -9,10 +14,48 @@ JOB_DIR = "/data/jobs" # Inside container
 if not os.path.exists(JOB_DIR):
     os.makedirs(JOB_DIR, exist_ok=True)
 
+# One atexit hook per process, not per instance: run_pack_job constructs a
+# fresh JobManager per build inside the long-lived pool workers, and
+# registering a bound method there would pin every instance until exit.
+_INSTANCES = weakref.WeakSet()
+
+def _close_all():
+    for manager in list(_INSTANCES):
+        manager.close()
+
+atexit.register(_close_all)
+
+# Upper bound on cached replay states; keeps the cache to the jobs being
+# actively polled instead of every job the process has ever served
+_REPLAY_CACHE_MAX = 256
+
 class JobManager:
+    def __init__(self):
+        # job_id -> (bytes already replayed, replayed state). Lets get_job
+        # apply only the tail of the event file on each poll instead of
+        # re-parsing every event from the start. LRU-bounded, and terminal
+        # jobs are evicted (their files never grow again).
+        self._replay_cache: "OrderedDict[str, Tuple[int, JobState]]" = OrderedDict()
+        # Per-job append handles so emit_event doesn't pay an open/close
+        # syscall pair per event
+        self._handles: Dict[str, BinaryIO] = {}
+        # Sharded by job id so concurrent emits/polls for different jobs
+        # don't serialize on a single mutex; operations on the same job
+        # stay ordered. threading.Lock (not asyncio) because emit_event is
+        # called from the event loop, FastAPI's thread pool and the pack
+        # worker processes' own managers alike.
+        self._locks = [threading.Lock() for _ in range(16)]
+        _INSTANCES.add(self)
+
+    def _lock(self, job_id: str) -> threading.Lock:
+        return self._locks[hash(job_id) % len(self._locks)]
+
+    def job_path(self, job_id: str) -> str:
+        return os.path.join(JOB_DIR, f"{job_id}.ndjson")
+
     def create_job(self) -> str:
         job_id = f"job-{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.urandom(4).hex()}"
-        job_path = os.path.join(JOB_DIR, f"{job_id}.ndjson")
+        job_path = self.job_path(job_id)
         
         # Create empty file
         with open(job_path, 'w') as f:
@@ -29,44 +72,96 @@ class JobManager:
             **data
         }
         
-        job_path = os.path.join(JOB_DIR, f"{job_id}.ndjson")
-        with open(job_path, 'a') as f:
-            f.write(json.dumps(event) + "\n")
+        with self._lock(job_id):
+            f = self._handles.get(job_id)
+            if f is None:
+                f = self._handles[job_id] = open(self.job_path(job_id), 'ab', buffering=1 << 16)
+            f.write(orjson.dumps(event) + b"\n")
+            # Flush per event so get_job and the SSE tail see it immediately
+            f.flush()
+
+            if data.get("status") in ("done", "failed"):
+                f.close()
+                del self._handles[job_id]
+
+    def release(self, job_id: str):
+        """Close the cached append handle for a job, if one is open.
+
+        For callers whose last emit for a job is non-terminal - e.g. the API
+        process, where the done/failed event is written by the pool worker's
+        own manager - so the handle doesn't stay open until process exit.
+        """
+        with self._lock(job_id):
+            f = self._handles.pop(job_id, None)
+            if f is not None:
+                f.close()
+
+    def close(self):
+        for f in self._handles.values():
+            try:
+                f.flush()
+                f.close()
+            except Exception:
+                pass
+        self._handles.clear()
 
     def get_job(self, job_id: str) -> Optional[JobState]:
-        job_path = os.path.join(JOB_DIR, f"{job_id}.ndjson")
+        job_path = self.job_path(job_id)
         if not os.path.exists(job_path):
             return None
 
-        # Replay events
-        state = JobState(
-            job_id=job_id, 
-            status="pending", 
-            created_at=datetime.now(), # Estimate
-            updated_at=datetime.now()
-        )
-        
-        with open(job_path, 'r') as f:
-            for line in f:
-                if not line.strip(): continue
-                try:
-                    evt = json.loads(line)
-                    state.events.append(evt)
-                    
-                    # Apply mutations
-                    if evt.get("type") == "created":
-                        state.created_at = datetime.fromisoformat(evt["timestamp"])
-                    
-                    if "status" in evt:
-                        state.status = evt["status"]
-                        
-                    if "pack_id" in evt: state.pack_id = evt["pack_id"]
-                    if "version" in evt: state.version = evt["version"]
-                    if "error" in evt: state.error = evt["error"]
-                    if "artifact_url" in evt: state.artifact_url = evt["artifact_url"]
-                    
-                    state.updated_at = datetime.fromisoformat(evt["timestamp"])
-                except:
-                    pass
-                    
-        return state
+        with self._lock(job_id):
+            offset, state = self._replay_cache.get(job_id, (0, None))
+            if offset and os.path.getsize(job_path) < offset:
+                # File was truncated/recreated; replay from scratch
+                offset, state = 0, None
+
+            if state is None:
+                state = JobState(
+                    job_id=job_id,
+                    status="pending",
+                    created_at=datetime.now(), # Estimate
+                    updated_at=datetime.now()
+                )
+
+            # Replay only the events appended since the last call
+            with open(job_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break # Partial write; pick it up on the next poll
+                    offset += len(line)
+                    if not line.strip(): continue
+                    try:
+                        evt = orjson.loads(line)
+                        state.events.append(evt)
+
+                        # Apply mutations
+                        if evt.get("type") == "created":
+                            state.created_at = datetime.fromisoformat(evt["timestamp"])
+
+                        if "status" in evt:
+                            state.status = evt["status"]
+
+                        if "pack_id" in evt: state.pack_id = evt["pack_id"]
+                        if "version" in evt: state.version = evt["version"]
+                        if "error" in evt: state.error = evt["error"]
+                        if "artifact_url" in evt: state.artifact_url = evt["artifact_url"]
+
+                        state.updated_at = datetime.fromisoformat(evt["timestamp"])
+                    except Exception:
+                        pass
+
+            if state.status in ("done", "failed"):
+                # Terminal: the file is immutable from here on, so there is
+                # nothing left to replay incrementally
+                self._replay_cache.pop(job_id, None)
+            else:
+                self._replay_cache[job_id] = (offset, state)
+                self._replay_cache.move_to_end(job_id)
+                while len(self._replay_cache) > _REPLAY_CACHE_MAX:
+                    self._replay_cache.popitem(last=False)
+
+            # Copy out (with a snapshot of the events list) so later polls
+            # can't mutate what a caller is still serializing
+            return state.model_copy(update={"events": list(state.events)})
@@ -1,12 +1,69 @@
+import array
 import os
 import json
+import orjson
 import shutil
 import zipfile
 import blake3
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List
-from . import chunk, crypto, jobs
-from ..models import PackManifest
+from . import chunk, crypto, jobs, storage as storage_mod
+
+# Prefer Zstandard entries when the runtime supports them (Python 3.14+);
+# chunks.ndjson and manifests compress much faster under zstd than DEFLATE.
+ZIP_COMPRESSION = getattr(zipfile, "ZIP_ZSTANDARD", zipfile.ZIP_DEFLATED)
+
+# Directories that never contain pack content; pruned before descent so the
+# walk doesn't stat its way through vendored trees
+EXCLUDE_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build', '.mypy_cache'}
+
+# Already-compressed payloads (weights, media, archives) gain nothing from
+# recompression; store them in the artifact as-is and skip the CPU pass.
+STORED_EXTENSIONS = {
+    '.safetensors', '.gguf', '.onnx',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp',
+    '.mp3', '.mp4', '.webm', '.ogg',
+    '.zip', '.gz', '.zst', '.xz', '.bz2', '.7z',
+}
+
+def _process_file(task):
+    """Per-file work unit (module-level so it pickles for the process pool).
+    Reads, stores the normalized doc, chunks and hashes one source file.
+    Returns (rel_path, file_hash, file_chunks, content_len) or None on error."""
+    file_path, rel_path, docs_dir = task
+    try:
+        # Store normalized doc. Assuming already normalized or raw text for
+        # MVP, so copy at the kernel level (sendfile/copy_file_range on
+        # Linux) instead of round-tripping the bytes through Python.
+        dest_path = os.path.join(docs_dir, rel_path)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copyfile(file_path, dest_path)
+
+        # Read once, only for chunking
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        # Chunk
+        file_chunks = chunk.deterministic_chunk(content, rel_path)
+
+        # Hash file (mmap + multithreaded blake3, no re-encode of content)
+        file_hash = crypto.hash_file(file_path)
+
+        return (rel_path, file_hash, file_chunks, len(content))
+    except Exception as e:
+        print(f"Skipping {os.path.basename(file_path)}: {e}")
+        return None
+
+def run_pack_job(job_id: str, pack_id: str, version: str, source_dir: str, metadata: dict):
+    """Picklable entry point so the API can run builds in a process pool.
+
+    Takes only plain args; constructs JobManager and Storage in the worker
+    process. Events append to the shared NDJSON job file, so they are
+    visible to the API process immediately.
+    """
+    return create_pack(job_id, pack_id, version, source_dir, metadata,
+                       jobs.JobManager(), storage_mod.Storage())
 
 def create_pack(job_id: str, pack_id: str, version: str, source_dir: str, metadata: dict, job_manager: jobs.JobManager, storage):
     """
@@ -26,107 +83,125 @@ def create_pack(job_id: str, pack_id: str, version: str, source_dir: str, metada
     os.makedirs(docs_dir, exist_ok=True)
     
     job_manager.emit_event(job_id, "status", {"status": "normalizing"})
-    
-    all_chunks = []
+
+    # Chunks as parallel columns (SoA) instead of one dict per chunk: far
+    # fewer Python objects on 100k-chunk packs, and offsets pack into 8-byte
+    # machine ints rather than boxed int objects
+    chunk_ids = []
+    chunk_sources = []
+    chunk_offsets = array.array('q')
+    chunk_texts = []
     file_hashes = {}
-    
+
     # 1. Process Files
     file_count = 0
     total_size = 0
-    
+
+    # Enumerate first, then fan the per-file work (read/chunk/hash) out to a
+    # process pool - it's CPU-bound and embarrassingly parallel.
+    tasks = []
     for root, dirs, files in os.walk(source_dir):
+        # Prune in place so os.walk never descends into excluded/hidden dirs
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS and not d.startswith('.')]
         for file in files:
+            # Skip hidden
+            if file.startswith("."):
+                continue
             file_path = os.path.join(root, file)
             rel_path = os.path.relpath(file_path, source_dir)
-            
-            # Skip hidden or extensive
-            if file.startswith(".") or "__pycache__" in root:
-                continue
+            tasks.append((file_path, rel_path, docs_dir))
+
+    if tasks:
+        with ProcessPoolExecutor() as ex:
+            results = list(ex.map(_process_file, tasks, chunksize=16))
+    else:
+        results = []
+
+    # Sort by rel_path so chunk order stays deterministic regardless of
+    # which worker finished first
+    for rel_path, file_hash, file_chunks, content_len in sorted(r for r in results if r):
+        for c in file_chunks:
+            chunk_ids.append(c["id"])
+            chunk_sources.append(rel_path)
+            chunk_offsets.append(c["offset"])
+            chunk_texts.append(c["text"])
+        file_hashes[rel_path] = file_hash
+        file_count += 1
+        total_size += content_len
 
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                # Store normalized doc
-                dest_path = os.path.join(docs_dir, rel_path)
-                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                with open(dest_path, 'w', encoding='utf-8') as f:
-                    f.write(content) # Assuming already normalized or raw text for MVP
-                    
-                # Chunk
-                file_chunks = chunk.deterministic_chunk(content, rel_path)
-                all_chunks.extend(file_chunks)
-                
-                # Hash file
-                file_hash = crypto.hash_content(content.encode())
-                file_hashes[rel_path] = file_hash
-                
-                file_count += 1
-                total_size += len(content)
-                
-            except Exception as e:
-                print(f"Skipping {file}: {e}")
-
-    job_manager.emit_event(job_id, "progress", {"files": file_count, "chunks": len(all_chunks)})
+    job_manager.emit_event(job_id, "progress", {"files": file_count, "chunks": len(chunk_ids)})
     
-    # 2. Manifest
+    # 2. Manifest (PackManifest shape; built as a plain dict so the file is
+    # serialized exactly once, below)
     content_hash_input = "".join(sorted(file_hashes.values()))
     global_hash = crypto.hash_content(content_hash_input.encode())
-    
-    # Key management: Load from env or generate
-    # For MVP we just use the signer
-    signature_hex, public_key_hex = crypto.sign_data(global_hash.encode())
-
-    manifest = PackManifest(
-        pack_id=pack_id,
-        version=version,
-        name=metadata.get("name", pack_id),
-        description=metadata.get("description"),
-        publisher=metadata.get("publisher", "Anonymous"),
-        license=metadata.get("license", "CC-BY-4.0"),
-        created_at=datetime.utcnow().isoformat(),
-        content_hash=global_hash,
-        chunk_count=len(all_chunks),
-        file_count=file_count,
-        signature=signature_hex,
-        public_key=public_key_hex
-    )
-    
+
+    manifest = {
+        "pack_id": pack_id,
+        "version": version,
+        "name": metadata.get("name") or pack_id,
+        "description": metadata.get("description"),
+        "publisher": metadata.get("publisher") or "Anonymous",
+        "license": metadata.get("license") or "CC-BY-4.0",
+        "created_at": datetime.utcnow().isoformat(),
+        "content_hash": global_hash,
+        "chunk_count": len(chunk_ids),
+        "file_count": file_count,
+    }
+
+    # Canonical bytes once (OPT_SORT_KEYS, compact): these exact bytes are
+    # what gets signed - the manifest minus signature/public_key, per the
+    # PackManifest docstring - and the signature fields are then spliced in
+    # textually rather than paying a second serialize of the whole manifest.
+    body = orjson.dumps(manifest, option=orjson.OPT_SORT_KEYS)
+    signature_hex, public_key_hex = crypto.sign_data(body)
+
     # Write Manifest
-    with open(os.path.join(packs_dir, "pack.json"), "w") as f:
-         # Use Pydantic's model_dump_json for standard serialization
-         # but we want canonical... pydantic doesn't do canonical 'sort_keys' out of box easily
-         # convert to dict, then json dump with sort_keys
-         f.write(json.dumps(manifest.model_dump(), sort_keys=True, separators=(',', ':')))
-
-    # Write Chunks
-    with open(os.path.join(packs_dir, "chunks.ndjson"), "w") as f:
-        for c in all_chunks:
-            f.write(json.dumps(c, sort_keys=True) + "\n")
+    with open(os.path.join(packs_dir, "pack.json"), "wb") as f:
+         f.write(body[:-1]
+                 + b',"public_key":"' + public_key_hex.encode()
+                 + b'","signature":"' + signature_hex.encode() + b'"}')
+
+    # Write Chunks - records are only materialized one at a time here, by
+    # zipping the columns back together (PackChunk shape)
+    with open(os.path.join(packs_dir, "chunks.ndjson"), "wb") as f:
+        f.writelines(
+            orjson.dumps(
+                {"id": cid, "source": src, "offset": off, "text": txt},
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+            )
+            for cid, src, off, txt in zip(chunk_ids, chunk_sources, chunk_offsets, chunk_texts)
+        )
             
     # 3. Zip
     job_manager.emit_event(job_id, "status", {"status": "packaging"})
     zip_path = f"{work_dir}/{pack_id}-{version}.zip"
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(zip_path, 'w', ZIP_COMPRESSION, compresslevel=3) as zipf:
         for root, dirs, files in os.walk(packs_dir):
             for file in files:
                 file_path = os.path.join(root, file)
                 arcname = os.path.relpath(file_path, packs_dir)
-                zipf.write(file_path, arcname)
+                stored = os.path.splitext(file)[1].lower() in STORED_EXTENSIONS
+                zipf.write(file_path, arcname,
+                           compress_type=zipfile.ZIP_STORED if stored else None)
 
     # 4. Upload
+    # Fingerprint the artifact (mmap-backed blake3) so consumers can verify
+    # the exact bytes they download
+    artifact_hash = crypto.hash_file(zip_path)
     minio_path = f"packs/{pack_id}/{version}/pack.zip"
     storage.upload_file(minio_path, zip_path)
-    
+
     # Cleanup
     shutil.rmtree(work_dir)
-    
+
     job_manager.emit_event(job_id, "done", {
         "status": "done",
         "pack_id": pack_id,
         "version": version,
-        "artifact_url": minio_path
+        "artifact_url": minio_path,
+        "artifact_hash": artifact_hash
     })
     
     return minio_path
@@ -4,23 +4,32 @@ from typing import BinaryIO
 
 class Storage:
     def __init__(self):
+        # Optional local mode: when STORAGE_LOCAL_DIR is set, artifacts are
+        # staged onto a mounted directory instead of MinIO
+        self.local_dir = os.getenv("STORAGE_LOCAL_DIR")
         self.endpoint = os.getenv("MINIO_ENDPOINT", "minio:9000")
         self.access_key = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
         self.secret_key = os.getenv("MINIO_SECRET_KEY", "minioadmin")
         self.bucket = os.getenv("MINIO_BUCKET", "verifiable-ai")
         self.secure = os.getenv("MINIO_SECURE", "false").lower() == "true"
+        self.upload_concurrency = int(os.getenv("MINIO_UPLOAD_CONCURRENCY", "8"))
         
         # Strip protocol if present
         if "://" in self.endpoint:
              self.endpoint = self.endpoint.split("://")[1]
 
+        if self.local_dir:
+            self.client = None
+            os.makedirs(self.local_dir, exist_ok=True)
+            return
+
         self.client = Minio(
             self.endpoint,
             access_key=self.access_key,
             secret_key=self.secret_key,
             secure=self.secure
         )
-        
+
         self._ensure_bucket()
 
     def _ensure_bucket(self):
@@ -30,8 +39,35 @@ class Storage:
         except Exception as e:
             print(f"Error checking bucket: {e}")
 
+    def _stage_local(self, object_name: str, file_path: str):
+        # Kernel-level copy (sendfile): pages move file-to-file without ever
+        # crossing into Python, so staging large artifacts costs no user-space
+        # reads or bytes allocations
+        dst = os.path.join(self.local_dir, object_name)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as src, open(dst, 'wb') as out:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+
     def upload_file(self, object_name: str, file_path: str):
-        self.client.fput_object(self.bucket, object_name, file_path)
+        if self.local_dir:
+            self._stage_local(object_name, file_path)
+            return
+        # Stream straight from the open file with explicit 16 MiB multipart
+        # sizing; parts upload on parallel connections so one TCP stream
+        # doesn't cap throughput for large artifacts
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            self.client.put_object(
+                self.bucket, object_name, f,
+                length=size, part_size=16 * 1024 * 1024,
+                num_parallel_uploads=self.upload_concurrency
+            )
 
     def upload_stream(self, object_name: str, data: BinaryIO, length: int):
         self.client.put_object(self.bucket, object_name, data, length)
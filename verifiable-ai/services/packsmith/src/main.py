@@ -1,14 +1,34 @@
 from fastapi import FastAPI, BackgroundTasks, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import shutil
+import json
 import os
 import uuid
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 
 from .models import BuildPackRequest, JobState
 from .core import jobs, ingest, pack, storage
 
-app = FastAPI(title="Packsmith", version="0.1.0")
+# Pack builds are CPU-bound (hashing, chunking, compression); a process pool
+# gives them real cores instead of fighting the API over the GIL and
+# FastAPI's thread pool
+PACK_POOL = None
+
+# Cap on builds in flight; excess jobs stay "pending" on the semaphore
+# instead of admitting unbounded CPU+memory load
+BUILD_SEM = asyncio.Semaphore(int(os.getenv("MAX_BUILDS", "4")))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global PACK_POOL
+    PACK_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    yield
+    PACK_POOL.shutdown(wait=False)
+    PACK_POOL = None
+
+app = FastAPI(title="Packsmith", version="0.1.0", lifespan=lifespan)
 
 job_manager = jobs.JobManager()
 store = storage.Storage()
@@ -38,7 +58,7 @@ async def build_pack(
 ):
     # Create Job
     job_id = job_manager.create_job()
-    
+
     # Metadata dict
     meta = {
         "name": name,
@@ -46,21 +66,69 @@ async def build_pack(
         "publisher": publisher,
         "license": license
     }
-    
+
+    # Drain the upload to disk in 1 MiB chunks now, so the background task
+    # gets a path instead of keeping Starlette's spooled UploadFile (and its
+    # buffer) alive for the whole build
+    upload_path = None
+    if file is not None:
+        os.makedirs(ingest.WORK_ROOT, exist_ok=True)
+        upload_path = os.path.join(ingest.WORK_ROOT, f"{job_id}.upload")
+        with open(upload_path, "wb") as out:
+            while True:
+                chunk = await file.read(1 << 20)
+                if not chunk:
+                    break
+                out.write(chunk)
+        await file.close()
+
     # Trigger background task
     background_tasks.add_task(
-        run_build_job, 
-        job_id, 
-        pack_id, 
-        version, 
-        source_type, 
-        source_value, 
-        file, 
+        run_build_job,
+        job_id,
+        pack_id,
+        version,
+        source_type,
+        source_value,
+        upload_path,
         meta
     )
-    
+
     return {"job_id": job_id, "status": "pending"}
 
+@app.get("/packs/build/{job_id}/stream")
+async def stream_build_events(job_id: str):
+    # SSE stream of job events so clients don't have to poll get_build_status.
+    # Tails the NDJSON event file; ends after a terminal (done/failed) event.
+    job_path = job_manager.job_path(job_id)
+    if not os.path.exists(job_path):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        with open(job_path, 'rb') as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    await asyncio.sleep(0.1)
+                    continue
+                if not line.endswith(b"\n"):
+                    # Partial write from the producer; rewind and retry
+                    f.seek(-len(line), os.SEEK_CUR)
+                    await asyncio.sleep(0.1)
+                    continue
+                data = line.strip()
+                if not data:
+                    continue
+                yield b"data: " + data + b"\n\n"
+                try:
+                    evt = json.loads(data)
+                except ValueError:
+                    continue
+                if evt.get("status") in ("done", "failed"):
+                    return
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/packs/build/{job_id}")
 def get_build_status(job_id: str):
     job = job_manager.get_job(job_id)
@@ -68,27 +136,37 @@ def get_build_status(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
-async def run_build_job(job_id: str, pack_id: str, version: str, source_type: str, source_value: str, upload_file: UploadFile, meta: dict):
-    try:
-        job_manager.emit_event(job_id, "status", {"status": "ingesting", "pack_id": pack_id, "version": version})
-        
-        # 1. Ingest
-        source_dir = await ingest.ingest_source(job_id, source_type, source_value, upload_file)
-        
-        # 2. Build Pack (Normalize -> Chunk -> Sign -> Zip -> Upload)
-        # We run this in thread pool to avoid blocking async loop if it does heavy CPU work
-        # But pack.create_pack is sync, so wrap it
-        loop = asyncio.get_running_loop()
-        artifact_url = await loop.run_in_executor(
-            None, 
-            pack.create_pack, 
-            job_id, pack_id, version, source_dir, meta, job_manager, store
-        )
-        
-        # Cleanup source
-        shutil.rmtree(source_dir, ignore_errors=True)
-        
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        job_manager.emit_event(job_id, "error", {"error": str(e), "status": "failed"})
+async def run_build_job(job_id: str, pack_id: str, version: str, source_type: str, source_value: str, upload_path: str, meta: dict):
+    # Jobs queue here while MAX_BUILDS builds are already in flight; the job
+    # stays "pending" until a slot frees up
+    async with BUILD_SEM:
+        try:
+            job_manager.emit_event(job_id, "status", {"status": "ingesting", "pack_id": pack_id, "version": version})
+
+            # 1. Ingest
+            source_dir = await ingest.ingest_source(job_id, source_type, source_value, upload_path)
+
+            # 2. Build Pack (Normalize -> Chunk -> Sign -> Zip -> Upload)
+            # Runs in the process pool; run_pack_job takes only picklable args
+            # and reconstructs JobManager/Storage in the worker process.
+            # PACK_POOL is None outside the lifespan (tests), which falls back
+            # to the default thread pool.
+            loop = asyncio.get_running_loop()
+            artifact_url = await loop.run_in_executor(
+                PACK_POOL,
+                pack.run_pack_job,
+                job_id, pack_id, version, source_dir, meta
+            )
+
+            # Cleanup source
+            shutil.rmtree(source_dir, ignore_errors=True)
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            job_manager.emit_event(job_id, "error", {"error": str(e), "status": "failed"})
+        finally:
+            # On success the terminal event is written by the pool worker's
+            # own JobManager, so this process' cached append handle would
+            # otherwise stay open until exit (one leaked fd per build)
+            job_manager.release(job_id)
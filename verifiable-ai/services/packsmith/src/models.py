@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Literal, Dict, Any
 from datetime import datetime
 
@@ -31,6 +31,11 @@ class BuildPackRequest(BaseModel):
 # --- Pack Manifest Schema (pack.json) ---
 
 class PackChunk(BaseModel):
+    # Schema/API boundary only - the pack builder works on plain dicts and
+    # serializes with orjson, so no model is constructed per chunk. Frozen +
+    # forbid keeps instances immutable and catches stray fields cheaply.
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: str  # Deterministic Hash
     source: str # filename or url
     offset: int
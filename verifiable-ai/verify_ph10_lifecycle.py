@@ -1,33 +1,75 @@
+import json
 import requests
 import time
 import sys
 
 BASE_URL = "http://localhost:8080"
 
+# One Session so keep-alive is reused across every call instead of a fresh
+# TCP connection per request
+SESSION = requests.Session()
+
 def log(msg):
     print(f"[TEST] {msg}")
 
 def create_job(kind="lora_train", payload=None):
     if payload is None:
         payload = {"model_id": "test-model"}
-    resp = requests.post(f"{BASE_URL}/training/jobs", json={"kind": kind, "payload": payload, "queue": "default"})
+    resp = SESSION.post(f"{BASE_URL}/training/jobs", json={"kind": kind, "payload": payload, "queue": "default"})
     resp.raise_for_status()
     return resp.json()["job_id"]
 
 def get_job(jid):
-    return requests.get(f"{BASE_URL}/training/jobs/{jid}").json()
+    return SESSION.get(f"{BASE_URL}/training/jobs/{jid}").json()
 
 def cancel_job(jid):
-    return requests.post(f"{BASE_URL}/training/jobs/{jid}/cancel").json()
+    return SESSION.post(f"{BASE_URL}/training/jobs/{jid}/cancel").json()
 
 def retry_job(jid):
-    return requests.post(f"{BASE_URL}/training/jobs/{jid}/retry").json()
+    return SESSION.post(f"{BASE_URL}/training/jobs/{jid}/retry").json()
 
 def pause_job(jid):
-    return requests.post(f"{BASE_URL}/training/jobs/{jid}/pause").json()
+    return SESSION.post(f"{BASE_URL}/training/jobs/{jid}/pause").json()
 
 def resume_job(jid):
-    return requests.post(f"{BASE_URL}/training/jobs/{jid}/resume").json()
+    return SESSION.post(f"{BASE_URL}/training/jobs/{jid}/resume").json()
+
+def wait_for_status(jid, target, timeout=10):
+    """Wait until the job reaches the target status; returns the final job.
+
+    Subscribes to the job's event stream first, so the common fast case
+    returns at event-delivery latency instead of the next poll tick. Falls
+    back to backoff polling if the endpoint is missing or the stream drops.
+    """
+    deadline = time.time() + timeout
+    try:
+        with SESSION.get(f"{BASE_URL}/training/jobs/{jid}/events",
+                         stream=True, timeout=(2, timeout)) as r:
+            if r.status_code == 200:
+                for line in r.iter_lines():
+                    if time.time() >= deadline:
+                        break
+                    if not line:
+                        continue
+                    if line.startswith(b"data: "):
+                        line = line[len(b"data: "):]
+                    try:
+                        evt = json.loads(line)
+                    except ValueError:
+                        continue
+                    if target in (evt.get("status"), evt.get("type")):
+                        return get_job(jid)
+    except requests.RequestException:
+        pass
+
+    # Polling fallback, exponential backoff capped at 1s
+    delay = 0.05
+    while True:
+        j = get_job(jid)
+        if j["status"] == target or time.time() >= deadline:
+            return j
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
 
 def run_verification():
     log("Starting Phase 10 Verification...")
@@ -71,15 +113,12 @@ def run_verification():
     cancel_job(blocker_id)
     log(f"Requested cancel for running job {blocker_id}")
     
-    # Wait for worker to term
-    for _ in range(10):
-        time.sleep(1)
-        j = get_job(blocker_id)
-        if j["status"] == "cancelled":
-            log("SUCCESS: Running job transitioned to cancelled.")
-            if j.get("finished_at"):
-                log("SUCCESS: finished_at is set.")
-            break
+    # Wait for worker to term: event stream if available, else backoff poll
+    j = wait_for_status(blocker_id, "cancelled", timeout=10)
+    if j["status"] == "cancelled":
+        log("SUCCESS: Running job transitioned to cancelled.")
+        if j.get("finished_at"):
+            log("SUCCESS: finished_at is set.")
     else:
         log(f"FAILURE: Running job did not cancel in time. Status: {j['status']}")
         sys.exit(1)
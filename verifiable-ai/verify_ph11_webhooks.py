@@ -1,4 +1,5 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import collections
 import json
 import threading
 import time
@@ -10,9 +11,11 @@ import sys
 # Configuration
 PORT = 8000
 SECRET = "my_secure_secret_123"
+SECRET_BYTES = SECRET.encode()
 ORCH_URL = "http://localhost:8080"
 
-received_events = []
+# Deque: O(1) appends from concurrent handler threads without list resizing
+received_events = collections.deque()
 server = None
 
 class WebhookHandler(BaseHTTPRequestHandler):
@@ -30,12 +33,13 @@ class WebhookHandler(BaseHTTPRequestHandler):
             return
 
         # Verify Signature
-        payload = f"{ts}.{body.decode('utf-8')}"
-        expected_sig = hmac.new(
-            SECRET.encode(), 
-            payload.encode(), 
-            hashlib.sha256
-        ).hexdigest()
+        # Feed the MAC the three byte slices directly instead of decoding and
+        # re-encoding the whole body just to prepend the timestamp
+        mac = hmac.new(SECRET_BYTES, digestmod=hashlib.sha256)
+        mac.update(ts.encode())
+        mac.update(b'.')
+        mac.update(body)
+        expected_sig = mac.hexdigest()
         
         if not hmac.compare_digest(sig, expected_sig):
             print(f"[TEST] Signature Mismatch! Got {sig}, Expected {expected_sig}")
@@ -65,7 +69,10 @@ class WebhookHandler(BaseHTTPRequestHandler):
 
 def start_server():
     global server
-    server = HTTPServer(('0.0.0.0', PORT), WebhookHandler)
+    # Threaded server so concurrent orchestrator deliveries/retries don't
+    # head-of-line block each other; daemon threads so shutdown is instant
+    server = ThreadingHTTPServer(('0.0.0.0', PORT), WebhookHandler)
+    server.daemon_threads = True
     print(f"[TEST] Webhook Receiver listening on port {PORT}")
     server.serve_forever()
 
@@ -95,7 +102,8 @@ def run_test():
     found_types = set()
     
     while time.time() - start < timeout:
-        for ev in received_events:
+        # Snapshot once per pass; handler threads may append mid-iteration
+        for ev in list(received_events):
             # Check envelope structure
             body = ev["body"]
             if body["job_id"] == job_id:
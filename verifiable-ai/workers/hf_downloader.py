@@ -4,8 +4,17 @@ import sys
 import json
 import time
 import signal
-import argparse
-from pathlib import Path
+import types
+import fnmatch
+import re
+import threading
+
+# Optional C JSON encoder; the done event can carry thousands of file
+# entries, where stdlib json.dumps is the bottleneck
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Clean SIGTERM handling for Phase 10 (Process Control)
 def handle_sigterm(sig, frame):
@@ -14,20 +23,88 @@ def handle_sigterm(sig, frame):
 
 signal.signal(signal.SIGTERM, handle_sigterm)
 
+# Workeren spawnes pr. job på et flygtigt filsystem; .pyc-skrivning er spildt
+sys.dont_write_bytecode = True
+
 def emit(obj):
-    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
-    sys.stdout.flush()
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+def iter_files(root):
+    # os.scandir-baseret walk: DirEntry genbruger stat-info fra directory-læsningen,
+    # så vi undgår de ekstra stat() syscalls pr. fil som Path.rglob/Path.stat koster.
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+def start_heartbeat(interval_secs, scan_dirs):
+    # Rigtige heartbeats mens snapshot_download blokerer: en timer-tråd der
+    # periodisk summerer bytes på disk (inkl. .incomplete partials), så
+    # orchestratorens cancel/timeout-logik har et signal undervejs.
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval_secs):
+            total = 0
+            for d in scan_dirs:
+                if not d or not os.path.isdir(d):
+                    continue
+                try:
+                    total += sum(e.stat(follow_symlinks=False).st_size for e in iter_files(d))
+                except OSError:
+                    continue
+            emit({"type": "progress", "phase": "downloading", "bytes": total, "ts": time.time()})
+
+    threading.Thread(target=beat, daemon=True).start()
+    return stop
+
+def parse_args(argv):
+    # Hand-rullet --key value parse i stedet for argparse: workeren spawnes
+    # pr. job, og argparse-import + action-tabeller koster målbar startup-tid.
+    # Ukendte flag ignoreres bare, som parse_known_args gjorde.
+    d = {}
+    i = 0
+    while i < len(argv):
+        if argv[i].startswith("-") and i + 1 < len(argv):
+            d[argv[i].lstrip("-").replace("-", "_")] = argv[i + 1]
+            i += 2
+        else:
+            i += 1
+    return d
 
 def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--repo_id", required=True)
-    ap.add_argument("--revision", default=None)
-    ap.add_argument("--cache_dir", default=None)
-    ap.add_argument("--local_dir", default=None)
-    ap.add_argument("--allow_patterns", default=None, help="Comma-separated patterns")
-    ap.add_argument("--ignore_patterns", default=None, help="Comma-separated patterns")
-    ap.add_argument("--heartbeat_secs", type=float, default=1.0)
-    args = ap.parse_args()
+    opts = parse_args(sys.argv[1:])
+    if "repo_id" not in opts:
+        emit({"type": "error", "message": "--repo_id is required"})
+        return 2
+    args = types.SimpleNamespace(
+        repo_id=opts["repo_id"],
+        revision=opts.get("revision"),
+        cache_dir=opts.get("cache_dir"),
+        local_dir=opts.get("local_dir"),
+        allow_patterns=opts.get("allow_patterns"),
+        ignore_patterns=opts.get("ignore_patterns"),
+        heartbeat_secs=float(opts.get("heartbeat_secs", 1.0)),
+    )
+
+    # Skal sættes FØR huggingface_hub importeres: hf_transfer (Rust-klienten)
+    # laver parallelle range-GETs pr. fil og genbruger forbindelserne, hvor
+    # standardklienten åbner en ny HTTPS-forbindelse pr. shard. Kun hvis
+    # pakken faktisk er installeret - med flaget sat men pakken fraværende
+    # nægter huggingface_hub at downloade overhovedet.
+    import importlib.util
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+    os.environ.setdefault("HF_HUB_DOWNLOAD_TIMEOUT", "30")
 
     try:
         from huggingface_hub import snapshot_download
@@ -40,6 +117,12 @@ def main():
     allow_patterns = args.allow_patterns.split(",") if args.allow_patterns else None
     ignore_patterns = args.ignore_patterns.split(",") if args.ignore_patterns else None
 
+    # Precompile mønstrene til én regex hver; enumerationen matcher så mod en
+    # DFA i stedet for at fnmatch'e N mønstre pr. fil. Holder også manifestet
+    # konsistent hvis local_dir indeholder filer fra tidligere runs.
+    allow_re = re.compile("|".join(fnmatch.translate(p) for p in allow_patterns)) if allow_patterns else None
+    ignore_re = re.compile("|".join(fnmatch.translate(p) for p in ignore_patterns)) if ignore_patterns else None
+
     emit({
         "type": "start",
         "repo_id": args.repo_id,
@@ -49,32 +132,37 @@ def main():
         "ts": time.time(),
     })
 
-    # Heartbeat threadless: vi printer progress events undervejs ved at poll’e tid
-    last_beat = time.time()
-
     try:
-        # snapshot_download er typisk ret “silent”; vi bruger heartbeat mens den arbejder
-        # ved at køre den i samme tråd og sende beats før/efter. V1 = coarse.
+        # snapshot_download er typisk ret “silent”; heartbeat-tråden sender
+        # byte-progress mens den blokerer, stoppes i finally uanset udfald.
         emit({"type":"progress","phase":"downloading","detail":"started"})
-        snapshot_dir = snapshot_download(
-            repo_id=args.repo_id,
-            revision=args.revision,
-            token=token,
-            cache_dir=args.cache_dir,
-            local_dir=args.local_dir,
-            allow_patterns=allow_patterns,
-            ignore_patterns=ignore_patterns,
-            resume_download=True,
-        )
+        heartbeat = start_heartbeat(args.heartbeat_secs, [args.local_dir, args.cache_dir])
+        try:
+            snapshot_dir = snapshot_download(
+                repo_id=args.repo_id,
+                revision=args.revision,
+                token=token,
+                cache_dir=args.cache_dir,
+                local_dir=args.local_dir,
+                allow_patterns=allow_patterns,
+                ignore_patterns=ignore_patterns,
+                resume_download=True,
+                max_workers=int(os.environ.get("HF_MAX_WORKERS", 8)),
+            )
+        finally:
+            heartbeat.set()
         emit({"type":"progress","phase":"downloading","detail":"finished"})
 
         # Enumerér filer for downstream manifest
-        p = Path(snapshot_dir)
+        root = str(snapshot_dir)
         files = []
-        for f in p.rglob("*"):
-            if f.is_file():
-                rel = str(f.relative_to(p)).replace("\\", "/")
-                files.append({"rel_path": rel, "size": f.stat().st_size})
+        for entry in iter_files(root):
+            rel = os.path.relpath(entry.path, root).replace("\\", "/")
+            if allow_re and not allow_re.match(rel):
+                continue
+            if ignore_re and ignore_re.match(rel):
+                continue
+            files.append({"rel_path": rel, "size": entry.stat(follow_symlinks=False).st_size})
 
         # resolved revision kan hentes via repo cache metadata, men den er ikke altid triviel.
         # Vi sender revision input tilbage + snapshot_dir; orchestrator kan resolve senere hvis ønsket.
@@ -9,19 +9,46 @@ def handle_sigterm(sig, frame):
     sys.exit(0)
 
 signal.signal(signal.SIGTERM, handle_sigterm)
-import argparse
+
+# Workeren spawnes pr. job på et flygtigt filsystem; .pyc-skrivning er spildt
+sys.dont_write_bytecode = True
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def emit(event_type, **kwargs):
     msg = {"type": event_type}
     msg.update(kwargs)
-    print(json.dumps(msg), flush=True)
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(msg) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(msg), flush=True)
+
+def parse_args(argv):
+    # Hand-rolled --key value parse; argparse import/setup is measurable
+    # startup cost for a worker spawned per job. Unknown flags are skipped,
+    # matching the old parse_known_args behaviour.
+    d = {}
+    i = 0
+    while i < len(argv):
+        if argv[i].startswith("-") and i + 1 < len(argv):
+            d[argv[i].lstrip("-").replace("-", "_")] = argv[i + 1]
+            i += 2
+        else:
+            i += 1
+    return d
 
 def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--job-id", required=True)
-    parser.add_argument("--out-dir", required=True)
-    # ignore other args
-    args, _ = parser.parse_known_args()
+    opts = parse_args(sys.argv[1:])
+    for req in ("job_id", "out_dir"):
+        if req not in opts:
+            emit("error", message=f"--{req} is required")
+            sys.exit(2)
+    import types
+    args = types.SimpleNamespace(job_id=opts["job_id"], out_dir=opts["out_dir"])
 
     # Simulate lifecycle
     time.sleep(1)